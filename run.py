@@ -2,18 +2,83 @@ import hashlib
 import json
 import logging
 import os
+import queue
+import sqlite3
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from datetime import datetime
-from glob import glob
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Union, List, Any, Dict
+from typing import Union, List, Any, Dict, Tuple
+
+# Хеш нужен только для обнаружения изменений, криптостойкость не требуется, поэтому
+# кроме md5 (есть всегда) доступны более быстрые алгоритмы, если установлены их пакеты.
+# Имя алгоритма сохраняется вместе с хешем: хеши разных алгоритмов сравнивать нельзя.
+HASHERS = {'md5': hashlib.md5}
+try:
+    from blake3 import blake3
+    HASHERS['blake3'] = blake3
+except ImportError:
+    pass
+try:
+    import xxhash
+    HASHERS['xxh3_128'] = xxhash.xxh3_128
+except ImportError:
+    pass
+
+# Алгоритм хеширования задаётся в конфиге явно ('hash_algorithm'), чтобы установка
+# пакета не меняла его незаметно
+HASH_ALGORITHM = 'md5'
+
+# Алгоритм, которым посчитаны хеши в json-записях, где он не указан
+LEGACY_HASH_ALGORITHM = 'md5'
+
+
+def _json_default(obj: Any) -> str:
+    # Бинарные хеши переводятся в hex прямо во время сериализации, без копирования записей
+    if isinstance(obj, bytes):
+        return obj.hex()
+    raise TypeError(f"Объект типа {type(obj).__name__} не сериализуется в json")
+
+
+# orjson сортирует ключи и форматирует вывод на C, stdlib json - запасной вариант
+try:
+    import orjson
+
+    def _dump(obj: Any, filename: Union[str, Path]) -> None:
+        data = orjson.dumps(obj, default=_json_default, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2)
+        with open(filename, 'wb') as f:
+            f.write(data)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dump(obj: Any, filename: Union[str, Path]) -> None:
+        # json.dump пишет в файл по частям, не собирая весь документ в одну строку
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, default=_json_default, sort_keys=True, indent=2, ensure_ascii=False)
+
+    _loads = json.loads
+
+# Имя sqlite-индекса с последними данными о файлах (лежит в папке с записями)
+PREV_INDEX_FILENAME = 'prev_index.sqlite'
+
+# Сколько путей подставляется в один запрос к индексу (лимит sqlite на число параметров - 999)
+SQLITE_MAX_VARIABLES = 500
+
+# Сколько прочитанных блоков может ждать хеширования при последовательном чтении
+PIPELINE_QUEUE_SIZE = 64
+
+# Размер блока, которым файл читается при вычислении хеша
+HASH_CHUNK_SIZE = 1 * (2 ** 20)  # 1 MB
 
 
 def setup_logger(
         filename: Union[str, Path],
         level: Union[str, int] = 'INFO',
+        console_level: Union[str, int] = 'DEBUG',
 ) -> logging.Logger:
     """
     Настраивает логгирование с ротацией и автоматическим сжатием в zip.
@@ -22,6 +87,7 @@ def setup_logger(
         filename: путь к файлу, куда будет записан лог
         level: уровень записей, которые будут записаны в файл
                (не влияет на вывод в консоли)
+        console_level: уровень записей, которые будут выведены в консоль
 
     Returns:
         logging.Logger: logger, настроенный на логирование в консоль и файл.
@@ -39,11 +105,13 @@ def setup_logger(
     file_handler.setLevel(level)
     file_handler.setFormatter(formatter)
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.DEBUG)
+    console_handler.setLevel(console_level)
     console_handler.setFormatter(formatter)
 
     _logger = logging.getLogger(__name__)
-    _logger.setLevel(logging.DEBUG)
+    # Уровень логгера - самый подробный из уровней обработчиков, чтобы проверки
+    # logger.isEnabledFor() позволяли не готовить сообщения, которые никуда не попадут
+    _logger.setLevel(min(file_handler.level, console_handler.level))
     _logger.addHandler(file_handler)
     _logger.addHandler(console_handler)
 
@@ -60,8 +128,8 @@ def get_config(filename: str) -> dict:
     Returns:
         dict: словарь со всеми данными из конфига.ы
     """
-    with open(filename, 'r') as f:
-        config = json.load(f)
+    with open(filename, 'rb') as f:
+        config = _loads(f.read())
     return config
 
 
@@ -82,75 +150,372 @@ def get_file_list_from_json(filename: str) -> List[str]:
     return files
 
 
-def get_hash(filename: str) -> str:
+def _fadvise(fd: int, advice_name: str) -> None:
+    """
+    Передаёт ядру подсказку о шаблоне доступа к файлу, если платформа это поддерживает
+    (os.posix_fadvise и константы есть не везде, например их нет на Windows).
+
+    Args:
+        fd (int): файловый дескриптор.
+        advice_name (str): имя константы из модуля os, например 'POSIX_FADV_SEQUENTIAL'.
+
+    Returns:
+        None: ничего не возвращает, ошибки подсказки игнорируются.
+    """
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except OSError:
+        # Подсказка необязательна: например, pipe или fs без поддержки fadvise
+        pass
+
+
+def get_hash(filename: str, algorithm: Union[str, None] = None) -> bytes:
     """
     Возвращает хеш файла по его имени (в т.ч. пути к файлу).
 
     Args:
         filename: имя файла, хеш содержимого которого необходимо вычислить.
+        algorithm: имя алгоритма из HASHERS (по умолчанию - HASH_ALGORITHM).
 
     Returns:
-        str: строка, содержащая хеш файла.
+        bytes: хеш файла в бинарном виде (в hex переводится только при записи в json).
     """
-    file_hash = hashlib.md5()
+    file_hash = HASHERS[algorithm or HASH_ALGORITHM]()
     with open(filename, 'rb') as f:
-        while chunk := f.read(32768):
+        # Файл читается один раз и последовательно: просим ядро читать вперёд агрессивнее
+        _fadvise(f.fileno(), 'POSIX_FADV_SEQUENTIAL')
+        # Блоками через read(), а не через mmap: если файл обрежут во время хеширования,
+        # mmap приведёт к SIGBUS и падению всего процесса, а read() просто вернёт меньше данных
+        while chunk := f.read(HASH_CHUNK_SIZE):
             file_hash.update(chunk)
 
-    return file_hash.hexdigest()
+        # Повторно файл не понадобится, поэтому не засоряем им page cache
+        _fadvise(f.fileno(), 'POSIX_FADV_DONTNEED')
 
+    return file_hash.digest()
 
-def get_modification_date(filename: str) -> str:
+
+def get_modification_date(st_mtime: float) -> str:
     """
     Возвращает время модификации файла в виде строки.
 
     Args:
-        filename (str): имя файла, дату создания которого необходимо узнать.
+        st_mtime (float): время последней модификации файла (st_mtime из os.stat).
 
     Returns:
         str: строка, содержащая дату и время последней модификации файла.
     """
-    ti_m = os.path.getmtime(filename)
-    m_ti = time.ctime(ti_m)
-    t_obj = time.strptime(m_ti)
-    str_time = time.strftime("%Y-%m-%d %H:%M:%S", t_obj)
-    return str_time
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(st_mtime))
+
+
+def _try_get_hash(filename: str) -> Tuple[Union[bytes, None], Union[Exception, None]]:
+    """
+    Вычисляет хеш одного файла. Выполняется в потоке пула, поэтому не пишет в лог,
+    а возвращает возникшую ошибку вызывающему коду.
+
+    Args:
+        filename (str): путь к файлу.
+
+    Returns:
+        tuple: пара (хеш файла, None) или (None, возникшее исключение).
+    """
+    try:
+        return get_hash(filename), None
+    except Exception as e:
+        return None, e
 
 
-def get_curr_files_data(filenames: List[str]) -> Dict[str, Any]:
+def _pipeline_hash(filenames: List[str]) -> List[Tuple[Union[bytes, None], Union[Exception, None]]]:
+    """
+    Вычисляет хеши файлов конвейером: один поток последовательно читает файлы с диска
+    (без конкурирующих open/read, которые на HDD приводят к лишним перемещениям головки),
+    а потоки-хешеры по числу ядер обновляют хеши прочитанными блоками.
+    Все блоки одного файла попадают в очередь одного хешера, поэтому порядок сохраняется.
+
+    Args:
+        filenames (list[str]): пути к файлам.
+
+    Returns:
+        list: для каждого файла пара (хеш файла, None) или (None, возникшее исключение).
+    """
+    hasher = HASHERS[HASH_ALGORITHM]
+    workers_count = max(1, min(os.cpu_count() or 1, len(filenames)))
+    queues = [
+        queue.Queue(maxsize=max(1, PIPELINE_QUEUE_SIZE // workers_count))
+        for _ in range(workers_count)
+    ]
+    results: List[Tuple[Union[bytes, None], Union[Exception, None]]] = [(None, None)] * len(filenames)
+
+    def produce() -> None:
+        # Сообщения в очереди: (id, блок, None) - очередной блок, (id, None, None) - конец файла,
+        # (id, None, ошибка) - файл не удалось прочитать; None - чтение завершено
+        try:
+            for file_id, filename in enumerate(filenames):
+                file_queue = queues[file_id % workers_count]
+                try:
+                    with open(filename, 'rb') as f:
+                        _fadvise(f.fileno(), 'POSIX_FADV_SEQUENTIAL')
+                        while chunk := f.read(HASH_CHUNK_SIZE):
+                            file_queue.put((file_id, chunk, None))
+                        _fadvise(f.fileno(), 'POSIX_FADV_DONTNEED')
+                except Exception as e:
+                    file_queue.put((file_id, None, e))
+                else:
+                    file_queue.put((file_id, None, None))
+        finally:
+            for file_queue in queues:
+                file_queue.put(None)
+
+    def consume(file_queue: queue.Queue) -> None:
+        # Ошибка хеширования не должна останавливать поток: иначе производитель навсегда
+        # заблокируется на заполненной очереди. Блоки файла с ошибкой просто вычитываются
+        # до его маркера конца.
+        file_hash = None
+        hash_error = None
+        while (message := file_queue.get()) is not None:
+            file_id, chunk, error = message
+            if chunk is not None:
+                if hash_error is None:
+                    try:
+                        if file_hash is None:
+                            file_hash = hasher()
+                        file_hash.update(chunk)
+                    except Exception as e:
+                        hash_error = e
+                continue
+
+            error = error or hash_error
+            if error is None:
+                try:
+                    if file_hash is None:
+                        file_hash = hasher()
+                    results[file_id] = (file_hash.digest(), None)
+                except Exception as e:
+                    error = e
+            if error is not None:
+                results[file_id] = (None, error)
+            file_hash = None
+            hash_error = None
+
+    threads = [threading.Thread(target=produce, daemon=True)]
+    threads += [threading.Thread(target=consume, args=(q,), daemon=True) for q in queues]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+def get_curr_files_data(
+        filenames: List[str],
+        prev_records: Union[Dict[str, Any], None] = None,
+        sequential_read: bool = False,
+) -> Dict[str, Any]:
     """
     Возвращает словарь, где каждому имени файла соответствует хеш и дата редактирования.
+    Если размер и время модификации файла совпадают с предыдущей записью,
+    то хеш берётся из неё и файл не перечитывается (как quick-check в make/rsync).
+    Хеш, вычисленный другим алгоритмом, не переиспользуется.
+    Остальные файлы обрабатываются параллельно в пуле потоков (чтение с диска и вычисление
+    хеша отпускают GIL), а словарь заполняется и лог пишется только в основном потоке.
+    Для HDD файлы можно читать строго последовательно в одном потоке (см. _pipeline_hash).
 
     Args:
         filenames (list[str]): пути к файлам
+        prev_records (dict): предыдущие записи о файлах (необязательно).
+        sequential_read (bool): читать файлы с диска последовательно (для HDD).
 
     Returns:
         dict: словарь с ключём-именем файла, содержащий словари с данными об этих файлах.
     """
+    if prev_records is None:
+        prev_records = {}
+
+    # Аргументы сообщений (json.dumps) вычисляются до проверки уровня логгером, поэтому проверяем заранее
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
     files_data = {}
+    existing_filenames = []
+    existing_stats = []
     for filename in filenames:
         try:
-            if not Path(filename).exists():
-                logger.error(f"Файл '{filename}' не найден")
-                continue
+            st = os.stat(filename)
+        except FileNotFoundError:
+            logger.error("Файл '%s' не найден", filename)
+            continue
+        except Exception as e:
+            logger.error("Невозможно получить актуальные данные о файле '%s'", filename, exc_info=e)
+            continue
+
+        prev_record = prev_records.get(filename)
+        if (
+                prev_record is not None
+                and prev_record.get('hash_algo') == HASH_ALGORITHM
+                and prev_record.get('size') == st.st_size
+                and prev_record.get('mtime_ns') == st.st_mtime_ns
+        ):
+            files_data[filename] = file_data = {
+                'hash': prev_record['hash'],
+                'hash_algo': HASH_ALGORITHM,
+                'modify': get_modification_date(st.st_mtime),
+                'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns,
+            }
+            if debug_enabled:
+                logger.debug(
+                    "Файл '%s' не изменился с прошлой проверки:\n%s",
+                    filename, json.dumps(file_data, default=_json_default),
+                )
+            continue
+
+        existing_filenames.append(filename)
+        existing_stats.append(st)
 
-            file_hash = get_hash(filename)
-            file_creation_date = get_modification_date(filename)
+    if not existing_filenames:
+        return files_data
+
+    if sequential_read:
+        results = _pipeline_hash(existing_filenames)
+    else:
+        with ThreadPoolExecutor(max_workers=min(32, len(existing_filenames))) as executor:
+            results = list(executor.map(_try_get_hash, existing_filenames))
+
+    for filename, st, (file_hash, error) in zip(existing_filenames, existing_stats, results):
+        if error is not None or file_hash is None:
+            logger.error("Невозможно получить актуальные данные о файле '%s'", filename, exc_info=error)
+            continue
 
-            files_data[filename] = dict(
-                hash=file_hash,
-                modify=file_creation_date,
+        files_data[filename] = file_data = {
+            'hash': file_hash,
+            'hash_algo': HASH_ALGORITHM,
+            'modify': get_modification_date(st.st_mtime),
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+        }
+        if debug_enabled:
+            logger.debug(
+                "Получены актуальные данные о файле '%s':\n%s",
+                filename, json.dumps(file_data, default=_json_default),
             )
-        except Exception as e:
-            logger.error(f"Невозможно получить актуальные данные о файле '{filename}'", exc_info=e)
-        else:
-            file_data = json.dumps(files_data[filename])
-            logger.debug(f"Получены актуальные данные о файле '{filename}':\n{file_data}")
 
     return files_data
 
 
-def get_prev_files_data(folder: Union[str, Path]) -> Dict[str, Dict[str, str]]:
+def _open_index(folder: Union[str, Path]) -> sqlite3.Connection:
+    """
+    Открывает (при необходимости создаёт) sqlite-индекс с последними данными о файлах.
+
+    Args:
+        folder: папка, в которой хранятся записи.
+
+    Returns:
+        sqlite3.Connection: соединение с индексом, в котором гарантированно есть таблица files.
+    """
+    conn = sqlite3.connect(os.path.join(folder, PREV_INDEX_FILENAME))
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS files ('
+        'path TEXT PRIMARY KEY, '
+        'hash BLOB NOT NULL, '
+        'hash_algo TEXT NOT NULL, '
+        'size INTEGER NOT NULL, '
+        'mtime_ns INTEGER NOT NULL)'
+    )
+    return conn
+
+
+def _remove_index(folder: Union[str, Path]) -> None:
+    """
+    Удаляет повреждённый sqlite-индекс (вместе с файлами журнала WAL),
+    чтобы при следующем сохранении он был создан заново.
+
+    Args:
+        folder: папка, в которой хранятся записи.
+
+    Returns:
+        None: ничего не возвращает, ошибки удаления записываются в лог.
+    """
+    index_filename = os.path.join(folder, PREV_INDEX_FILENAME)
+    for filename in (index_filename, f'{index_filename}-wal', f'{index_filename}-shm'):
+        try:
+            os.remove(filename)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error("Невозможно удалить повреждённый индекс '%s'", filename, exc_info=e)
+            return
+
+    logger.warning("Повреждённый индекс '%s' удалён и будет создан заново", index_filename)
+
+
+def get_prev_files_data(
+        folder: Union[str, Path],
+        filenames: List[str],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Возвращает словарь, где каждому из переданных имён файлов соответствует хеш,
+    размер и время модификации из sqlite-индекса. Читаются только нужные записи.
+    Если индекса ещё нет или его невозможно прочитать, то данные читаются
+    из последнего json-файла с записями. Повреждённый индекс удаляется,
+    чтобы при сохранении он был создан заново.
+
+    Args:
+        folder (str): путь к папке с записями о файлах.
+        filenames (list[str]): пути к файлам, для которых нужны предыдущие данные.
+
+    Returns:
+        dict: словарь с ключом-именем файла, содержащий словари с данными об этих файлах.
+        {}: пустой словарь в случае, если предыдущих записей нет или их невозможно прочитать.
+    """
+    index_filename = os.path.join(folder, PREV_INDEX_FILENAME)
+    if not os.path.exists(index_filename):
+        return get_prev_files_data_from_json(folder)
+
+    prev_files_data = {}
+    try:
+        with closing(_open_index(folder)) as conn:
+            for i in range(0, len(filenames), SQLITE_MAX_VARIABLES):
+                batch = filenames[i:i + SQLITE_MAX_VARIABLES]
+                rows = conn.execute(
+                    f"SELECT path, hash, hash_algo, size, mtime_ns FROM files "
+                    f"WHERE path IN ({', '.join('?' * len(batch))})",
+                    batch,
+                )
+                for filename, file_hash, hash_algo, size, mtime_ns in rows:
+                    prev_files_data[filename] = dict(
+                        hash=file_hash,
+                        hash_algo=hash_algo,
+                        size=size,
+                        mtime_ns=mtime_ns,
+                    )
+
+    except Exception as e:
+        logger.error(
+            "Невозможно прочитать данные из '%s', будут использованы данные из последнего json-файла",
+            index_filename, exc_info=e,
+        )
+        # OperationalError - например, индекс заблокирован или недоступен, а не повреждён
+        if isinstance(e, sqlite3.DatabaseError) and not isinstance(e, sqlite3.OperationalError):
+            _remove_index(folder)
+        return get_prev_files_data_from_json(folder)
+
+    logger.info("Прочитаны предыдущие данные из '%s'", index_filename)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        for filename, file_data in prev_files_data.items():
+            logger.debug(
+                "Получены предыдущие данные о файле '%s':\n%s",
+                filename, json.dumps(file_data, default=_json_default),
+            )
+
+    return prev_files_data
+
+
+def get_prev_files_data_from_json(folder: Union[str, Path]) -> Dict[str, Dict[str, Any]]:
     """
     Возвращает словарь, где каждому имени файла соответствует хеш и дата редактирования.
     Если в папке не оказывается записей, то возвращается пустой словарь.
@@ -170,20 +535,59 @@ def get_prev_files_data(folder: Union[str, Path]) -> Dict[str, Dict[str, str]]:
 
     try:
         with open(last_info_filename, 'rb') as f:
-            prev_files_data = json.load(f)
+            prev_files_data = _loads(f.read())
+
+        for file_data in prev_files_data.values():
+            file_data['hash'] = bytes.fromhex(file_data['hash'])
+            file_data.setdefault('hash_algo', LEGACY_HASH_ALGORITHM)
 
     except Exception as e:
-        logger.error(f"Невозможно прочитать данные из '{last_info_filename}'", exc_info=e)
+        logger.error("Невозможно прочитать данные из '%s'", last_info_filename, exc_info=e)
         return {}
 
-    logger.info(f"Прочитаны предыдущие данные из '{last_info_filename}'")
+    logger.info("Прочитаны предыдущие данные из '%s'", last_info_filename)
 
-    for filename, file_data in prev_files_data.items():
-        logger.debug(f"Получены предыдущие данные о файле '{filename}':\n{file_data}")
+    if logger.isEnabledFor(logging.DEBUG):
+        for filename, file_data in prev_files_data.items():
+            logger.debug(
+                "Получены предыдущие данные о файле '%s':\n%s",
+                filename, json.dumps(file_data, default=_json_default),
+            )
 
     return prev_files_data
 
 
+def save_files_data(folder: Union[str, Path], curr_records: Dict[str, Any]) -> None:
+    """
+    Обновляет sqlite-индекс актуальными данными о файлах одной транзакцией.
+    Индекс служит кешем хешей по (путь, размер, время модификации), поэтому записи
+    о файлах, которых нет среди актуальных, удаляются, чтобы он не рос бесконечно.
+
+    Args:
+        folder: папка, в которой хранятся записи.
+        curr_records (dict): словарь с актуальными записями о файлах.
+
+    Returns:
+        None: ничего не возвращает.
+    """
+    rows = [
+        (filename, record['hash'], record['hash_algo'], record['size'], record['mtime_ns'])
+        for filename, record in curr_records.items()
+    ]
+    with closing(_open_index(folder)) as conn:
+        with conn:
+            stale_rows = [
+                (filename,) for (filename,) in conn.execute('SELECT path FROM files')
+                if filename not in curr_records
+            ]
+            conn.executemany('DELETE FROM files WHERE path = ?', stale_rows)
+            conn.executemany(
+                'INSERT OR REPLACE INTO files (path, hash, hash_algo, size, mtime_ns) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows,
+            )
+
+
 def get_last_info_filename(folder: Union[str, Path]) -> Union[str, None]:
     """
     Возвращает последний актуальный файл с записями.
@@ -195,12 +599,24 @@ def get_last_info_filename(folder: Union[str, Path]) -> Union[str, None]:
         str: путь к последнему файлу с записями в папке.
         None: если записей нет.
     """
-    folder = str(Path(folder))
-    filenames = glob(f'{folder}/*.json')
-    filenames.sort(reverse=True)
+    folder = os.fspath(folder)
+    try:
+        with os.scandir(folder) as entries:
+            # Имена записей содержат дату, поэтому последняя запись - максимальная по имени
+            last_filename = max(
+                (
+                    entry.name for entry in entries
+                    if entry.name.endswith('.json')
+                    and not entry.name.startswith('.')
+                    and entry.is_file(follow_symlinks=False)
+                ),
+                default=None,
+            )
+    except FileNotFoundError:
+        return None
 
-    if len(filenames) > 0:
-        return filenames[0]
+    if last_filename is not None:
+        return os.path.join(folder, last_filename)
     return None
 
 
@@ -211,6 +627,8 @@ def mark_changed_files(
     """
     Записывает в curr_records состояния файлов (изменен, не изменён, создан)
     на основании данных из prev_records. Изменяет переданный curr_records!
+    Если предыдущий хеш вычислен другим алгоритмом, то для сравнения файл
+    перехешируется этим алгоритмом.
 
     Args:
         prev_records (dict): словарь с предыдущими записями о файлах.
@@ -219,57 +637,84 @@ def mark_changed_files(
     Returns:
         None: ничего не возвращает, т.к. изменяет curr_records, переданный в аргументах.
     """
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
     for filename, curr_record in curr_records.items():
-        if filename not in prev_records:
+        prev_record = prev_records.get(filename)
+        if prev_record is None:
             curr_record['state'] = 'new'
             continue
 
-        hash1 = str(curr_record['hash'])
-        hash2 = str(prev_records[filename]['hash'])
-
-        if hash1 != hash2:
-            curr_record['state'] = 'changed'
-        else:
-            curr_record['state'] = 'unchanged'
-
-        logger.debug(f"Финальные данные о файле '{filename}':\n{curr_record}")
+        curr_hash = curr_record['hash']
+        if curr_record['hash_algo'] != prev_record['hash_algo']:
+            # Хеши разных алгоритмов несравнимы: считаем текущий хеш алгоритмом предыдущей записи
+            try:
+                curr_hash = get_hash(filename, prev_record['hash_algo'])
+            except Exception as e:
+                logger.warning(
+                    "Невозможно вычислить хеш файла '%s' алгоритмом %s, файл считается изменённым",
+                    filename, prev_record['hash_algo'], exc_info=e,
+                )
+                curr_hash = None
+
+        curr_record['state'] = 'changed' if curr_hash != prev_record['hash'] else 'unchanged'
+
+        if debug_enabled:
+            logger.debug(
+                "Финальные данные о файле '%s':\n%s",
+                filename, json.dumps(curr_record, default=_json_default),
+            )
 
 
 def main() -> None:
     """
     Читает список файлов из json-конфига и получает их хеши и даты создания.
-    Собранные данные сохраняются в новый файл.
+    Собранные данные сохраняются в sqlite-индекс и (если включено в конфиге) в новый json-файл.
     """
     try:
         filenames = get_file_list_from_json(CONFIG_FILENAME)
     except Exception as e:
         logger.critical(
-            f"Ошибка во время чтения списка файлов из '{CONFIG_FILENAME}'. "
-            f"Закрытие программы!",
+            "Ошибка во время чтения списка файлов из '%s'. "
+            "Закрытие программы!",
+            CONFIG_FILENAME,
             exc_info=e,
         )
         return
 
-    prev_records = get_prev_files_data(SCRIPTS_INFO_FOLDER)
-    curr_records = get_curr_files_data(filenames)
+    prev_records = get_prev_files_data(SCRIPTS_INFO_FOLDER, filenames)
+    curr_records = get_curr_files_data(filenames, prev_records, SEQUENTIAL_READ)
 
     mark_changed_files(prev_records, curr_records)
 
+    os.makedirs(SCRIPTS_INFO_FOLDER, exist_ok=True)
+    try:
+        save_files_data(SCRIPTS_INFO_FOLDER, curr_records)
+    except Exception as e:
+        logger.critical(
+            "Невозможно записать собранные данные в индекс '%s'",
+            os.path.join(SCRIPTS_INFO_FOLDER, PREV_INDEX_FILENAME),
+            exc_info=e
+        )
+    else:
+        logger.debug("Собранные данные успешно записаны в индекс")
+
+    if not WRITE_JSON_SNAPSHOT:
+        return
+
     date_str = datetime.now().strftime("%Y%m%dT%H%M%S")
-    filename4dump = f'{SCRIPTS_INFO_FOLDER}/scripts_info_{date_str}.json'
-    os.makedirs(Path(filename4dump).parent, exist_ok=True)
+    filename4dump = os.path.join(SCRIPTS_INFO_FOLDER, f'scripts_info_{date_str}.json')
 
     try:
-        with open(filename4dump, 'w') as f:
-            json.dump(curr_records, f, sort_keys=True, indent=4)
+        _dump(curr_records, filename4dump)
     except Exception as e:
         logger.critical(
-            f"Невозможно записать собранные данные в файл '{filename4dump}'",
+            "Невозможно записать собранные данные в файл '%s'",
+            filename4dump,
             exc_info=e
         )
         return
     else:
-        logger.debug(f"Собранные данные успешно записаны в файл '{filename4dump}'")
+        logger.debug("Собранные данные успешно записаны в файл '%s'", filename4dump)
 
 
 if __name__ == '__main__':
@@ -290,10 +735,27 @@ if __name__ == '__main__':
     # Папка, куда будут записаны json'ки с хешами и другими данными файлов
     SCRIPTS_INFO_FOLDER = loaded_config['records_folder']
 
+    # Нужно ли дополнительно к sqlite-индексу сохранять json'ку с записями за этот запуск
+    WRITE_JSON_SNAPSHOT = loaded_config.get('json_snapshot', True)
+
+    # Читать файлы с диска строго последовательно в одном потоке (имеет смысл для HDD)
+    SEQUENTIAL_READ = loaded_config.get('sequential_read', False)
+
+    # Алгоритм хеширования: md5 или, если установлены пакеты, blake3 / xxh3_128
+    HASH_ALGORITHM = loaded_config.get('hash_algorithm', 'md5')
+    if HASH_ALGORITHM not in HASHERS:
+        print(f"Алгоритм хеширования '{HASH_ALGORITHM}' недоступен. "
+              f"Доступные алгоритмы: {', '.join(HASHERS)}")
+        exit(1)
+
+    # Уровни записей, которые попадут в файл лога и в консоль
+    LOG_LEVEL = loaded_config.get('log_level', 'DEBUG')
+    CONSOLE_LOG_LEVEL = loaded_config.get('console_log_level', 'DEBUG')
+
     log_filename = Path(LOG_FILENAME)
     os.makedirs(log_filename.parent, exist_ok=True)
 
-    logger = setup_logger(log_filename, level=logging.DEBUG)
+    logger = setup_logger(log_filename, level=LOG_LEVEL, console_level=CONSOLE_LOG_LEVEL)
 
     try:
         main()